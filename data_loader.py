@@ -1,11 +1,23 @@
 import pandas as pd
 
+from cleaning import CleaningEngine, IQRCap
 
-def load_and_clean_data():
+
+# outlier capping rules per table; group_by fits separate bounds per group,
+# e.g. IQRCap('supply_price', group_by='supplier_id') caps per supplier
+CLEANING_RULES = {
+    'order_items': [IQRCap('unit_price')],
+    'product_suppliers': [IQRCap('supply_price')],
+}
+
+
+def load_and_clean_data(cleaner=None):
     """
     Imports the csv files, cleans the data,
     and formats the datatypes
 
+    :param cleaner: optional CleaningEngine; pass an already fitted one to
+        reuse its bounds, or keep a reference to read its report()
     :returns: all the cleaned tables
     """
 
@@ -26,42 +38,23 @@ def load_and_clean_data():
     # cleaning the data before rendering visualizations
 
     # ---------- capping outliers ----------
-    # order_items table
-    Q01 = order_items['unit_price'].quantile(0.25)
-    Q03 = order_items['unit_price'].quantile(0.75)
-    IQR1 = Q03 - Q01
-
-    lb1 = Q01 - 1.5 * IQR1
-    ub1 = Q03 + 1.5 * IQR1
-
-    order_items.loc[order_items['unit_price'] < lb1, 'unit_price'] = lb1
-    order_items.loc[order_items['unit_price'] > ub1, 'unit_price'] = ub1
+    cleaner = CleaningEngine(CLEANING_RULES) if cleaner is None else cleaner
 
+    # order_items table
+    cleaner.apply('order_items', order_items)
     order_items['total_price'] = order_items['quantity'] * order_items['unit_price']
 
-    # orders table
-    Q1 = orders['total_amount'].quantile(0.25)
-    Q3 = orders['total_amount'].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-
-    orders.loc[orders['total_amount'] < lower_bound, 'total_amount'] = lower_bound
-    orders.loc[orders['total_amount'] > upper_bound, 'total_amount'] = upper_bound
-
-    # capping outliers in supply_price in product_suppliers
-    q1 = product_suppliers['supply_price'].quantile(0.25)
-    q3 = product_suppliers['supply_price'].quantile(0.75)
-    iqr = q3 - q1
-    _lb = q1 - 1.5 * iqr
-    _ub = q3 + 1.5 * iqr
-
-    product_suppliers.loc[product_suppliers['supply_price'] < _lb, 'supply_price'] = _lb
-    product_suppliers.loc[product_suppliers['supply_price'] > _ub, 'supply_price'] = _ub
+    # orders table: total_amount is the sum of the order's items, so it is
+    # recomputed from the capped prices (orders without items get 0) and not
+    # capped again, which keeps it equal to the sum of its items
+    orders['total_amount'] = order_items.groupby('order_id')['total_price'].sum().reindex(orders.index, fill_value=0)
 
     # ---------- dropping values ----------
     # dropping 'total_amount == 0' in orders
-    orders.drop(orders[orders['total_amount'] == 0].index, inplace=True)
+    cleaner.drop_rows('orders', orders, orders['total_amount'] == 0, 'total_amount == 0')
+
+    # capping outliers in supply_price in product_suppliers
+    cleaner.apply('product_suppliers', product_suppliers)
 
     # setting correct data types
 
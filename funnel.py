@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+
+class CustomerFunnel:
+    """
+    Customer funnel where every stage is a boolean mask over a dense
+    index of the registered customers. Stages are intersected in the
+    order they are added, so each stage only keeps customers that also
+    passed every stage before it.
+
+    :param customers: customers table indexed by customer_id
+    """
+
+    def __init__(self, customers):
+        self.customers = customers
+        self.index = pd.Index(customers.index)
+        self.stage_names = []
+        self.stage_masks = []
+
+    def mask_from_ids(self, customer_ids):
+        """
+        Converts a collection of customer ids into a boolean mask over
+        the dense customer index. Ids of unknown customers are ignored.
+
+        :param customer_ids: array-like of customer ids (duplicates allowed)
+        :returns: boolean numpy array, one entry per registered customer
+        """
+        positions = self.index.get_indexer(pd.unique(np.asarray(customer_ids)))
+        mask = np.zeros(len(self.index), dtype=bool)
+        mask[positions[positions >= 0]] = True
+        return mask
+
+    def add_stage(self, name, customer_ids=None, mask=None):
+        """
+        Appends a stage to the funnel, either from customer ids or from
+        a ready-made boolean mask aligned with the customers table.
+
+        :param name: label of the stage
+        :param customer_ids: customers that qualify for the stage
+        :param mask: boolean array-like aligned with the customers table
+        :returns: the funnel itself, so calls can be chained
+        """
+        if mask is None and customer_ids is None:
+            raise ValueError(f"stage '{name}' needs either customer_ids or a mask")
+        if mask is None:
+            mask = self.mask_from_ids(customer_ids)
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (len(self.index),):
+            raise ValueError(f"mask for stage '{name}' must have one entry per customer")
+
+        self.stage_names.append(name)
+        self.stage_masks.append(mask)
+        return self
+
+    def nested_masks(self):
+        """
+        :returns: 2D boolean array (stage x customer) of the cumulative
+            intersection of the stages
+        """
+        if not self.stage_masks:
+            return np.zeros((0, len(self.index)), dtype=bool)
+        return np.logical_and.accumulate(np.vstack(self.stage_masks), axis=0)
+
+    def counts(self):
+        """
+        :returns: dataframe with the 'stage' names and the 'number' of
+            customers reaching each stage
+        """
+        return pd.DataFrame({
+            'stage': self.stage_names,
+            'number': self.nested_masks().sum(axis=1)
+        })
+
+    def breakdown(self, segments):
+        """
+        Counts the customers reaching each stage per segment.
+
+        :param segments: series indexed by customer_id (e.g. state or
+            registration cohort), or the name of a customers column
+        :returns: dataframe with one row per stage and one column per segment
+        """
+        if isinstance(segments, str):
+            segments = self.customers[segments]
+        segments = pd.Series(segments).reindex(self.index)
+        codes, labels = pd.factorize(segments, sort=True)
+
+        # customers without a segment get code -1 and are left out
+        known = codes >= 0
+        counts = [
+            np.bincount(codes[mask & known], minlength=len(labels))
+            for mask in self.nested_masks()
+        ]
+        return pd.DataFrame(
+            np.array(counts, dtype='int64').reshape(len(self.stage_names), len(labels)),
+            index=pd.Index(self.stage_names, name='stage'),
+            columns=labels
+        )
+
+
+def registration_cohort(customers, freq='Y'):
+    """
+    :param customers: customers table with a 'registration_date' column
+    :param freq: period frequency of the cohorts ('Y', 'Q', 'M', ...)
+    :returns: series of registration cohorts indexed by customer_id
+    """
+    return customers['registration_date'].dt.to_period(freq).astype(str).rename('cohort')
+
+
+def build_engagement_funnel(df):
+    """
+    Builds the standard engagement funnel:
+    Registered -> Placed Orders -> Repeated Customers -> Reviewers
+
+    :param df: dict of cleaned tables as returned by load_and_clean_data()
+    :returns: CustomerFunnel with the four stages
+    """
+    funnel = CustomerFunnel(df['customers'])
+    order_counts = df['orders']['customer_id'].value_counts()
+
+    funnel.add_stage("Registered", mask=np.ones(len(funnel.index), dtype=bool))
+    funnel.add_stage("Placed Orders", order_counts[order_counts > 0].index)
+    funnel.add_stage("Repeated Customers", order_counts[order_counts > 1].index)
+    funnel.add_stage("Reviewers", df['reviews']['customer_id'])
+    return funnel
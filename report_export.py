@@ -0,0 +1,212 @@
+from data_loader import load_and_clean_data
+from figures import build_figures
+import argparse
+import html
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+
+# tables loaded once by the parent process and handed to every worker
+_tables = None
+
+
+def filter_tables(df, states=None, categories=None, start=None, end=None):
+    """
+    Restricts the cleaned tables to a report variant. The tables are not
+    modified; filtered copies are returned in a new dict.
+
+    :param df: dict of cleaned tables as returned by load_and_clean_data()
+    :param states: shipping states of the orders (and states of the customers)
+    :param categories: category names of the products
+    :param start: first month of the orders, e.g. '2024-01' (inclusive)
+    :param end: last month of the orders, e.g. '2024-06' (inclusive)
+    :returns: dict of filtered tables
+    """
+    tables = dict(df)
+    orders = tables['orders']
+    order_items = tables['order_items']
+    reviews = tables['reviews']
+
+    if states is not None:
+        orders = orders[orders['shipping_state'].isin(states)]
+        tables['customers'] = tables['customers'][tables['customers']['state'].isin(states)]
+
+    if start is not None or end is not None:
+        months = orders['order_date'].dt.to_period('M')
+        keep = pd.Series(True, index=orders.index)
+        if start is not None:
+            keep &= months >= pd.Period(start, freq='M')
+        if end is not None:
+            keep &= months <= pd.Period(end, freq='M')
+        orders = orders[keep]
+
+    if categories is not None:
+        tables['categories'] = tables['categories'][tables['categories']['category_name'].isin(categories)]
+        tables['products'] = tables['products'][tables['products']['category_id'].isin(tables['categories'].index)]
+        product_ids = tables['products'].index
+        tables['product_suppliers'] = tables['product_suppliers'][tables['product_suppliers']['product_id'].isin(product_ids)]
+        order_items = order_items[order_items['product_id'].isin(product_ids)]
+        orders = orders[orders.index.isin(order_items['order_id'])]
+        reviews = reviews[reviews['product_id'].isin(product_ids)]
+
+    if orders is not tables['orders']:
+        order_items = order_items[order_items['order_id'].isin(orders.index)]
+        reviews = reviews[reviews['order_id'].isin(orders.index)]
+
+    if categories is not None:
+        # the baskets also hold other categories, so the order totals only
+        # keep the items of the selected ones
+        totals = order_items.groupby('order_id', observed=True)['total_price'].sum()
+        orders = orders.assign(total_amount=totals.reindex(orders.index, fill_value=0).astype('float32'))
+
+    tables['orders'] = orders
+    tables['order_items'] = order_items
+    tables['reviews'] = reviews
+    return tables
+
+
+def variants_by_state(df):
+    """
+    :returns: one report variant per shipping state
+    """
+    states = sorted(df['orders']['shipping_state'].dropna().unique())
+    return [{'name': f'state-{state}', 'states': [state]} for state in states]
+
+
+def variants_by_category(df):
+    """
+    :returns: one report variant per product category
+    """
+    categories = sorted(df['categories']['category_name'].dropna().unique())
+    return [{'name': f'category-{category}', 'categories': [category]} for category in categories]
+
+
+def variants_by_month(df, months=1):
+    """
+    :param months: number of months covered by each variant
+    :returns: one report variant per range of consecutive months,
+        skipping ranges without orders
+    """
+    if months < 1:
+        raise ValueError('months must be at least 1')
+
+    periods = df['orders']['order_date'].dt.to_period('M')
+    first, last = periods.min(), periods.max()
+    variants = []
+    while first <= last:
+        end = min(first + (months - 1), last)
+        if periods.between(first, end).any():
+            name = f'month-{first}' if first == end else f'months-{first}-to-{end}'
+            variants.append({'name': name, 'start': str(first), 'end': str(end)})
+        first = end + 1
+    return variants
+
+
+def write_report(name, figures, out_dir, include_plotlyjs=True):
+    """
+    Writes the figures of a variant as one HTML page and one JSON bundle
+
+    :param name: name of the variant
+    :param figures: dict of figures as returned by build_figures()
+    :param out_dir: directory of the reports
+    :param include_plotlyjs: True to embed plotly.js (self-contained), 'cdn' to link it
+    :returns: paths of the HTML and JSON files
+    """
+    slug = re.sub(r'[^\w.-]+', '_', name)
+    html_path = os.path.join(out_dir, f'{slug}.html')
+    json_path = os.path.join(out_dir, f'{slug}.json')
+
+    # plotly.js only has to be included once per page
+    panels = [
+        fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs if i == 0 else False)
+        for i, fig in enumerate(figures.values())
+    ]
+    title = html.escape(f'Executive KPI Dashboard - {name}')
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(
+            f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n</head>\n'
+            f'<body style="font-family: Segoe UI, Arial, sans-serif">\n<h1>{title}</h1>\n'
+            + '\n'.join(panels)
+            + '\n</body>\n</html>\n'
+        )
+
+    with open(json_path, 'w', encoding='utf-8') as f:
+        f.write('{' + ', '.join(f'{json.dumps(key)}: {fig.to_json()}' for key, fig in figures.items()) + '}')
+
+    return html_path, json_path
+
+
+def _init_worker(df):
+    global _tables
+    _tables = df
+
+
+def _export_variant(variant, out_dir, include_plotlyjs):
+    result = {'name': variant['name'], 'html': None, 'json': None, 'error': None}
+    filters = {key: value for key, value in variant.items() if key != 'name'}
+    try:
+        tables = filter_tables(_tables, **filters)
+        if tables['orders'].empty:
+            result['error'] = 'no orders match the filters'
+            return result
+        figures = build_figures(tables)
+        result['html'], result['json'] = write_report(variant['name'], figures, out_dir, include_plotlyjs)
+    except Exception as e:
+        # one broken variant must not abort the rest of the batch
+        result['error'] = f'{type(e).__name__}: {e}'
+    return result
+
+
+def export_reports(df, variants, out_dir='reports', workers=None, include_plotlyjs=True):
+    """
+    Renders every dashboard panel for each variant in parallel, without
+    starting the Dash server. The tables are loaded once by the caller
+    and shared with the worker processes.
+
+    :param df: dict of cleaned tables as returned by load_and_clean_data()
+    :param variants: list of dicts with a 'name' and the filter_tables() arguments
+    :param out_dir: directory of the reports
+    :param workers: number of worker processes (defaults to the number of cores)
+    :param include_plotlyjs: True to embed plotly.js (self-contained), 'cdn' to link it
+    :returns: list of dicts with the 'name', the 'html' and 'json' paths and
+        the 'error' of each variant; variants without orders or that fail to
+        render are skipped with their error set and no files written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df,)) as pool:
+        return list(pool.map(_export_variant, variants, repeat(out_dir), repeat(include_plotlyjs)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the KPI dashboard as static HTML/JSON reports')
+    parser.add_argument('--by', nargs='+', choices=['all', 'state', 'category', 'month'], default=['all'],
+                        help='report variants to export')
+    parser.add_argument('--months', type=int, default=1, help='months per variant for --by month')
+    parser.add_argument('--out', default='reports', help='output directory')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--cdn', action='store_true', help='link plotly.js from the CDN instead of embedding it')
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    df = load_and_clean_data()
+
+    variants = []
+    if 'all' in args.by:
+        variants.append({'name': 'all'})
+    if 'state' in args.by:
+        variants += variants_by_state(df)
+    if 'category' in args.by:
+        variants += variants_by_category(df)
+    if 'month' in args.by:
+        variants += variants_by_month(df, args.months)
+
+    results = export_reports(df, variants, args.out, args.workers, 'cdn' if args.cdn else True)
+    failed = [result for result in results if result['error'] is not None]
+    for result in failed:
+        print(f"Skipped {result['name']}: {result['error']}")
+    print(f'Exported {len(results) - len(failed)} reports to {args.out} in {time.perf_counter() - start_time:.1f}s')